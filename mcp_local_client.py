@@ -1,168 +1,611 @@
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from contextlib import AsyncExitStack
+from collections import OrderedDict
 
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.spinner import Spinner
 
+import os
+import sys
 import json
+import time
+import codecs
+import threading
+import anyio
 import asyncio
-import nest_asyncio
 import ollama
 
 
+# Tools with side effects are always re-run instead of served from the tool cache
+UNCACHED_TOOL_PREFIXES = ("write_", "create_", "delete_", "update_")
+# Maximum number of tool results kept in the tool cache
+TOOL_CACHE_SIZE = 256
+# Maximum number of resource contents kept in the resource LRU
+RESOURCE_CACHE_SIZE = 128
+
+# Compact, key-sorted JSON encoder reused for tool cache keys and schemas;
+# json.dumps builds a new encoder on every call once any option is passed
+canonical_json = json.JSONEncoder(sort_keys=True, separators=(",", ":")).encode
+
+# Errors raised by a session whose server subprocess or stdio transport has gone away
+TRANSPORT_ERRORS = (anyio.BrokenResourceError, anyio.ClosedResourceError)
+# Seconds a session can sit unused before it is pinged ahead of its next request
+SESSION_IDLE_PING = 60
+# Seconds to wait for a ping reply before treating the server as hung
+SESSION_PING_TIMEOUT = 5
+
+# Embedding model used to pick the tools most relevant to a query
+TOOL_EMBED_MODEL = "nomic-embed-text"
+# Number of tool summaries sent per query when tool embeddings are available
+TOOL_TOP_K = 8
+# Registries up to this size are always sent whole, with full schemas: the tools block (which the
+# model template renders ahead of the system message) and with it the prompt prefix stay identical
+# across queries, and the model needs no discover_tool round-trip before using a tool
+TOOL_RETRIEVAL_MIN_TOOLS = 64
+
+# Meta-tool the model calls to fetch the full schema of a tool it only has a summary for
+DISCOVER_TOOL = ollama.Tool.model_validate({
+    "type": "function",
+    "function": {
+        "name": "discover_tool",
+        "description": "Get the full JSON schema (arguments) of a tool before calling it",
+        "parameters": {
+            "type": "object",
+            "required": ["name"],
+            "properties": {
+                "name": {"type": "string", "description": "Name of the tool"},
+            },
+        },
+    },
+})
+
+
+def tool_cache_key(name, arguments):
+    """Key a tool call on its name and a 64-bit hash of its canonical JSON arguments."""
+    # Hashing keeps large argument payloads (file contents, code) from being held as cache keys
+    return (name, hash(canonical_json(arguments or {})))
+
+
+def normalize(vector):
+    """Scale a vector to unit length so a dot product gives cosine similarity."""
+    norm = sum(x * x for x in vector) ** 0.5
+    return [x / norm for x in vector] if norm else vector
+
+
+def uri_scheme(uri):
+    """Return the scheme of a resource URI, e.g. "papers" for "papers://ai"."""
+    scheme, separator, _ = uri.partition("://")
+    return scheme if separator else None
+
+
+class StdinLineReader:
+    """Reads lines from stdin on the event loop, so a pending read can be cancelled (e.g. by Ctrl-C)."""
+
+    def __init__(self):
+        self.buffer = ""
+        self.decoder = codecs.getincrementaldecoder(sys.stdin.encoding or "utf-8")()
+        self.eof = False
+        # Set once the event loop turns out not to support add_reader (e.g. the proactor loop on Windows)
+        self.use_thread = False
+
+    async def wait_readable(self, fd):
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        try:
+            loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+        except PermissionError:
+            # Regular files can't be polled, but they are always readable
+            return
+        try:
+            await readable
+        finally:
+            loop.remove_reader(fd)
+
+    async def readline_in_thread(self):
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+
+        def settle(set_outcome, value):
+            if not result.done():
+                set_outcome(value)
+
+        def read():
+            try:
+                outcome = (result.set_result, sys.stdin.readline())
+            except BaseException as e:
+                outcome = (result.set_exception, e)
+            try:
+                loop.call_soon_threadsafe(settle, *outcome)
+            except RuntimeError:
+                # The loop already closed (the client exited while waiting for input)
+                pass
+
+        # A daemon thread rather than the default executor: asyncio.run joins executor threads on
+        # shutdown, which would keep a Ctrl-C'd client alive until Enter is pressed
+        threading.Thread(target=read, daemon=True).start()
+        line = await result
+        if not line:
+            raise EOFError
+        return line.rstrip("\r\n")
+
+    async def readline(self):
+        if self.use_thread:
+            return await self.readline_in_thread()
+
+        fd = sys.stdin.fileno()
+        while "\n" not in self.buffer and not self.eof:
+            try:
+                await self.wait_readable(fd)
+            except NotImplementedError:
+                self.use_thread = True
+                return await self.readline_in_thread()
+            data = os.read(fd, 4096)
+            self.eof = not data
+            self.buffer += self.decoder.decode(data, final=self.eof)
+
+        line, newline, self.buffer = self.buffer.partition("\n")
+        if not (line or newline):
+            raise EOFError
+        return line
+
+
+class WatchedReadStream:
+    """Read stream proxy that sets an event once the server closes its end (e.g. the subprocess exited)."""
+
+    def __init__(self, stream, closed_event):
+        self.stream = stream
+        self.closed_event = closed_event
+
+    async def __aenter__(self):
+        await self.stream.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self.stream.__aexit__(*exc_info)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.stream.__anext__()
+        except StopAsyncIteration:
+            self.closed_event.set()
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class PooledSession:
+    """Persistent MCP client session for one server that reconnects when its transport breaks."""
+
+    def __init__(self, server_name, server_config, console):
+        self.server_name = server_name
+        self.server_config = server_config
+        self.console = console
+        self.session = None
+        self.alive = False
+        self.last_used = 0.0
+        # Task that owns the stdio/session contexts, and the event that tells it to close them
+        self.task = None
+        self.stop_event = None
+        self.reconnect_lock = asyncio.Lock()
+
+    async def run(self, ready, stop_event):
+        # anyio requires the stdio/session contexts to be exited by the task that entered them,
+        # so each connection lives in its own task until it is asked to stop
+        try:
+            async with AsyncExitStack() as stack:
+                server_params = StdioServerParameters(**self.server_config)
+                read, write = await stack.enter_async_context(stdio_client(server_params))
+                disconnected = asyncio.Event()
+                session = await stack.enter_async_context(
+                    ClientSession(WatchedReadStream(read, disconnected), write)
+                )
+                await session.initialize()
+                ready.set_result(session)
+                # Stay connected until close() is called or the server goes away
+                waiters = [asyncio.create_task(stop_event.wait()), asyncio.create_task(disconnected.wait())]
+                try:
+                    await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    for waiter in waiters:
+                        waiter.cancel()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            elif self.alive:
+                self.console.print(f"Server {self.server_name} stopped: {e}")
+        finally:
+            # The connection ended on its own (e.g. the subprocess died) rather than through close()
+            if not stop_event.is_set() and self.stop_event is stop_event:
+                self.alive = False
+
+    async def connect(self):
+        ready = asyncio.get_running_loop().create_future()
+        self.stop_event = asyncio.Event()
+        self.task = asyncio.create_task(self.run(ready, self.stop_event))
+        self.session = await ready
+        self.alive = True
+        self.last_used = time.monotonic()
+        return self.session
+
+    async def close(self):
+        self.alive = False
+        if self.stop_event:
+            self.stop_event.set()
+        if self.task:
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    async def reconnect(self, failed_session):
+        async with self.reconnect_lock:
+            # Another request may already have replaced the failed session
+            if self.session is not failed_session and self.alive:
+                return
+            self.console.print(f"Reconnecting to {self.server_name}...")
+            await self.close()
+            await self.connect()
+
+    async def request(self, method, *args, **kwargs):
+        session = self.session
+        if self.alive and time.monotonic() - self.last_used > SESSION_IDLE_PING:
+            # Health-check an idle session before trusting it with a real request
+            try:
+                await asyncio.wait_for(session.send_ping(), SESSION_PING_TIMEOUT)
+            except (*TRANSPORT_ERRORS, asyncio.TimeoutError):
+                self.alive = False
+        if not self.alive:
+            await self.reconnect(session)
+            session = self.session
+
+        try:
+            result = await getattr(session, method)(*args, **kwargs)
+        except TRANSPORT_ERRORS:
+            self.alive = False
+            await self.reconnect(session)
+            result = await getattr(self.session, method)(*args, **kwargs)
+        self.last_used = time.monotonic()
+        return result
+
+    async def call_tool(self, name, arguments=None):
+        return await self.request("call_tool", name, arguments=arguments)
+
+    async def read_resource(self, uri):
+        return await self.request("read_resource", uri)
+
+    async def get_prompt(self, name, arguments=None):
+        return await self.request("get_prompt", name, arguments=arguments)
 
-nest_asyncio.apply()
 
 class MCP_ChatBot:
     def __init__(self):
-        self.exit_stack = AsyncExitStack()
+        # Pool of persistent sessions keyed by server name
+        self.servers = {}
         # Tool list
         self.available_tools = []
+        # Full tool schemas by name, pre-encoded as JSON and served on demand through discover_tool
+        self.tool_schemas = {}
+        # ollama.Tool with the name and one-line description of every tool, sent instead of full schemas
+        # for registries larger than TOOL_RETRIEVAL_MIN_TOOLS
+        self.tool_summaries = []
+        # Validated ollama.Tool payload, built once after all servers connect
+        self.tools_payload = ()
+        # Unit-length embedding of each tool, aligned with available_tools; empty if embedding failed
+        self.tool_embeddings = []
+        # System message describing how to use the tools; never mutated so the prompt prefix stays cacheable
+        # (across queries too, as long as select_tools sends the whole registry); None for small registries
+        self.tools_system_message = None
         # Prompts list for quick display 
         self.available_prompts = []
-        # Sessions dict maps tool/prompt names or resource URIs to MCP client sessions
-        self.sessions = {}
+        # Session dicts map tool names, prompt names and resource URIs to the pooled session of their server
+        self.tool_sessions = {}
+        self.prompt_sessions = {}
+        self.resource_sessions = {}
+        # Maps a URI scheme (e.g. "papers") to the last session that listed a resource under it
+        self.uri_by_scheme = {}
+        # Tool cache maps tool_cache_key(name, arguments) to tool output
+        self.tool_cache = {}
+        # Resource LRU maps resource URI to its text content, most recently used last
+        self.resource_cache = OrderedDict()
         # Rich console
         self.console = Console()
+        # Cancellable stdin reader for the chat loop
+        self.stdin_reader = StdinLineReader()
+        # Async Ollama client so model generation doesn't block the event loop
+        self.ollama_client = ollama.AsyncClient()
 
     async def connect_to_server(self, server_name, server_config):
-        try:
-            server_params = StdioServerParameters(**server_config)
-            stdio_transport = await self.exit_stack.enter_async_context(
-                stdio_client(server_params)
-            )
-            read, write = stdio_transport
-            session = await self.exit_stack.enter_async_context(
-                ClientSession(read, write)
-            )
-            await session.initialize()
-            
-            try:
-                # List available tools
-                response = await session.list_tools()
-                for tool in response.tools:
-                    self.sessions[tool.name] = session
-                    self.available_tools.append({
-                        "type": "function",
-                        "function": {
-                            "name": tool.name,
-                            "description": tool.description,
-                            "parameters": {
-                                "type": tool.inputSchema.get("type"),
-                                "required": tool.inputSchema.get("required"),
-                             },
-                            "properties": tool.inputSchema.get("properties"),
-                        }
-                    })
-
-                # List available prompts
-                prompts_response = await session.list_prompts()
-                if prompts_response and prompts_response.prompts:
-                    for prompt in prompts_response.prompts:
-                        self.sessions[prompt.name] = session
-                        self.available_prompts.append({
-                            "name": prompt.name,
-                            "description": prompt.description,
-                            "arguments": prompt.arguments
-                        })
-                # List available resources
-                resources_response = await session.list_resources()
-                if resources_response and resources_response.resources:
-                    for resource in resources_response.resources:
-                        resource_uri = str(resource.uri)
-                        self.sessions[resource_uri] = session
-            
-            except Exception as e:
-                self.console.print(f"Error {e}")
-                
-        except Exception as e:
-            self.console.print(f"Error connecting to {server_name}: {e}")
+        server = PooledSession(server_name, server_config, self.console)
+        self.servers[server_name] = server
+        session = await server.connect()
+
+        # List available tools, prompts and resources in a single round-trip
+        tools_response, prompts_response, resources_response = await asyncio.gather(
+            session.list_tools(),
+            session.list_prompts(),
+            session.list_resources(),
+            return_exceptions=True,
+        )
+
+        if isinstance(tools_response, Exception):
+            self.console.print(f"Error {tools_response}")
+        else:
+            for tool in tools_response.tools:
+                self.tool_sessions[tool.name] = server
+                self.available_tools.append({
+                    "type": "function",
+                    "function": {
+                        "name": tool.name,
+                        "description": tool.description,
+                        "parameters": {
+                            "type": tool.inputSchema.get("type"),
+                            "required": tool.inputSchema.get("required"),
+                         },
+                        "properties": tool.inputSchema.get("properties"),
+                    }
+                })
+
+        if isinstance(prompts_response, Exception):
+            self.console.print(f"Error {prompts_response}")
+        elif prompts_response and prompts_response.prompts:
+            for prompt in prompts_response.prompts:
+                self.prompt_sessions[prompt.name] = server
+                self.available_prompts.append({
+                    "name": prompt.name,
+                    "description": prompt.description,
+                    "arguments": prompt.arguments
+                })
+
+        if isinstance(resources_response, Exception):
+            self.console.print(f"Error {resources_response}")
+        elif resources_response and resources_response.resources:
+            for resource in resources_response.resources:
+                resource_uri = str(resource.uri)
+                self.resource_sessions[resource_uri] = server
+                scheme = uri_scheme(resource_uri)
+                if scheme:
+                    self.uri_by_scheme[scheme] = server
 
     async def connect_to_servers(self):
         try:
             with open("mcp_local_server_config.json", "r") as file:
                 data = json.load(file)
             servers = data.get("mcpServers", {})
-            for server_name, server_config in servers.items():
-                await self.connect_to_server(server_name, server_config)
+            # Spawn and initialize all servers concurrently
+            results = await asyncio.gather(
+                *[self.connect_to_server(name, config) for name, config in servers.items()],
+                return_exceptions=True,
+            )
+            for server_name, result in zip(servers, results):
+                if isinstance(result, Exception):
+                    self.console.print(f"Error connecting to {server_name}: {result}")
+            self.index_tools()
+            await self.embed_tools()
         except Exception as e:
             self.console.print(f"Error loading server config: {e}")
             raise
     
+    def index_tools(self):
+        """Build the chat payload: full schemas for small registries, summaries plus discover_tool for large ones."""
+        self.tool_schemas = {tool["function"]["name"]: canonical_json(tool) for tool in self.available_tools}
+        self.tool_summaries = []
+        if len(self.available_tools) <= TOOL_RETRIEVAL_MIN_TOOLS:
+            # An extra generation to discover a schema costs far more than prefilling a small registry
+            self.tools_payload = tuple(
+                ollama.Tool(
+                    function=ollama.Tool.Function(
+                        name=tool["function"]["name"],
+                        description=tool["function"]["description"],
+                        # ollama expects the argument properties inside parameters
+                        parameters=ollama.Tool.Function.Parameters.model_validate({
+                            **tool["function"]["parameters"],
+                            "properties": tool["function"]["properties"],
+                        }),
+                    )
+                )
+                for tool in self.available_tools
+            )
+            self.tools_system_message = None
+            return
+
+        for tool in self.available_tools:
+            description = (tool["function"]["description"] or "").strip()
+            # Build ollama's own models directly: it validates every tool dict on each chat call
+            # but passes ollama.Tool instances through untouched
+            self.tool_summaries.append(ollama.Tool(
+                function=ollama.Tool.Function(
+                    name=tool["function"]["name"],
+                    description=description.splitlines()[0] if description else "",
+                )
+            ))
+        self.tools_payload = (*self.tool_summaries, DISCOVER_TOOL)
+        self.tools_system_message = {
+            "role": "system",
+            "content": (
+                "Tools are listed by name and a one-line summary only, and more tools may exist than are listed. "
+                f"Before calling a tool for the first time, call {DISCOVER_TOOL['function']['name']} "
+                "with its name to get its arguments."
+            ),
+        }
+
+    async def embed_tools(self):
+        """Embed every tool's name and description in one batch request."""
+        if len(self.available_tools) <= TOOL_RETRIEVAL_MIN_TOOLS:
+            return
+        try:
+            response = await self.ollama_client.embed(
+                model = TOOL_EMBED_MODEL,
+                input = [
+                    f"{tool['function']['name']}: {tool['function']['description'] or ''}"
+                    for tool in self.available_tools
+                ],
+            )
+            self.tool_embeddings = [normalize(embedding) for embedding in response.embeddings]
+        except Exception as e:
+            self.tool_embeddings = []
+            self.console.print(f"Tool embeddings unavailable, sending all tools: {e}")
+
+    async def select_tools(self, query):
+        """Return the chat tools payload limited to the top-k tools most similar to the query."""
+        if not self.tool_embeddings:
+            return self.tools_payload
+        try:
+            response = await self.ollama_client.embed(model = TOOL_EMBED_MODEL, input = query)
+        except Exception as e:
+            self.console.print(f"Error embedding query, sending all tools: {e}")
+            return self.tools_payload
+
+        query_embedding = normalize(response.embeddings[0])
+        scores = [
+            sum(q * t for q, t in zip(query_embedding, tool_embedding))
+            for tool_embedding in self.tool_embeddings
+        ]
+        top_k = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:TOOL_TOP_K]
+        # Keep registry order and always include discover_tool, which is the last payload entry
+        return tuple(self.tools_payload[i] for i in sorted(top_k)) + self.tools_payload[-1:]
+
+    def discover_tool(self, name):
+        """Return the full schema of a tool as JSON."""
+        schema = self.tool_schemas.get(name)
+        if not schema:
+            return f"Tool '{name}' not found. Available tools: {', '.join(self.tool_schemas)}"
+        return schema
+
+    async def call_tool(self, tool):
+        """Run one tool call and return its output text."""
+        self.console.print(f"\n[bold green]Tool Call:[/bold green] {tool.function}\n")
+        if tool.function.name == DISCOVER_TOOL["function"]["name"]:
+            return self.discover_tool((tool.function.arguments or {}).get("name"))
+
+        session = self.tool_sessions.get(tool.function.name)
+        if not session:
+            self.console.print(f"Tool '{tool.function.name}' not found.")
+            return f"Tool '{tool.function.name}' not found."
+
+        cache_key = tool_cache_key(tool.function.name, tool.function.arguments)
+        tool_output = self.tool_cache.get(cache_key)
+        if tool_output is None:
+            result = await session.call_tool(tool.function.name, arguments=tool.function.arguments)
+
+            # Most tools return a single content item; skip building a list to join
+            parts = result.content
+            tool_output = parts[0].text if len(parts) == 1 else "".join(content.text for content in parts)
+
+            if not result.isError and not tool.function.name.startswith(UNCACHED_TOOL_PREFIXES):
+                if len(self.tool_cache) >= TOOL_CACHE_SIZE:
+                    # Evict the oldest entry
+                    del self.tool_cache[next(iter(self.tool_cache))]
+                self.tool_cache[cache_key] = tool_output
+        self.console.print(f"\n[bold magenta]Tool Output:[/bold magenta] {tool_output}\n")
+        return tool_output
+
     async def process_query(self, query):
-        messages = [{'role':'user', 'content':query}]
+        # The frozen system message always comes first so Ollama can reuse its cached prefix across turns;
+        # with top-k tool retrieval the tools block, and so the prefix, differs between queries
+        messages = [self.tools_system_message] if self.tools_system_message else []
+        messages.append({'role':'user', 'content':query})
+        tools = await self.select_tools(query)
         #self.console.print(f"Tools Available\n {json.dumps(self.available_tools, indent=4)}")
 
+        # Bind hot-path attributes once instead of looking them up on every chunk and tool call
+        chat = self.ollama_client.chat
+        cprint = self.console.print
+        call_tool = self.call_tool
+        append = messages.append
+
         while True:
-            response = ollama.chat(
+            stream = await chat(
                 model = 'qwen3:8b-q4_K_M',
-                tools = self.available_tools,
+                tools = tools,
                 messages = messages,
+                stream = True,
             )
             
             assistant_content = []
-            has_tool_use = False
+            tool_calls = []
+            tool_tasks = []
 
-            self.console.print(response.message.content)
-            assistant_content.append(response.message.content)
+            try:
+                async for chunk in stream:
+                    if chunk.message.content:
+                        # Markup off: a chunk can end in the middle of something that looks like a rich tag
+                        cprint(chunk.message.content, end="", markup=False)
+                        assistant_content.append(chunk.message.content)
+                    for tool in chunk.message.tool_calls or []:
+                        # Start each tool as soon as its call is parsed, while the rest of the response streams
+                        tool_calls.append(tool)
+                        tool_tasks.append(asyncio.create_task(call_tool(tool)))
+            except BaseException:
+                # The stream broke off; don't leave tools already started running unobserved
+                for task in tool_tasks:
+                    task.cancel()
+                await asyncio.gather(*tool_tasks, return_exceptions=True)
+                raise
+            cprint()
 
-            for tool in response.message.tool_calls or []:
-                has_tool_use = True
-                messages.append({
-                    "role": "assistant", 
-                    "content": "".join(assistant_content)
-                })
+            # Exit loop if no tool was used
+            if not tool_tasks:
+                break
+
+            # One assistant message per turn, followed by one tool message per call
+            append({
+                "role": "assistant", 
+                "content": "".join(assistant_content),
+                "tool_calls": tool_calls,
+            })
 
-                # Get session and call tool
-                self.console.print(f"\n[bold green]Tool Call:[/bold green] {tool.function}\n")
-                session = self.sessions.get(tool.function.name)
-                if not session:
-                    self.console.print(f"Tool '{tool.function.name}' not found.")
-                    break
-                    
-                result = await session.call_tool(tool.function.name, arguments=tool.function.arguments)
-
-                tool_output = []
-                for content in result.content:
-                    tool_output.append(content.text)
-                self.console.print(f"\n[bold magenta]Tool Output:[/bold magenta] {tool_output}\n")
+            # Tool calls of one turn run concurrently; results come back in call order
+            tool_outputs = await asyncio.gather(*tool_tasks, return_exceptions=True)
+            for tool_output in tool_outputs:
+                if isinstance(tool_output, Exception):
+                    # Report the failure to the model instead of aborting the other tool calls
+                    cprint(f"Error calling tool: {tool_output}")
+                    tool_output = f"Error: {tool_output}"
          
-                messages.append({
+                append({
                     "role": "tool", 
-                    "content": "".join(tool_output)
+                    "content": tool_output
                 })
-            
-            # Exit loop if no tool was used
-            if not has_tool_use:
-                break
 
-    async def get_resource(self, resource_uri):
-        session = self.sessions.get(resource_uri)
-        
-        # Fallback for papers URIs - try any papers resource session
-        if not session and resource_uri.startswith("papers://"):
-            for uri, sess in self.sessions.items():
-                if uri.startswith("papers://"):
-                    session = sess
-                    break
+    async def get_resource(self, resource_uri, refresh=False):
+        # Serve repeated reads from the LRU unless the caller asks for a fresh copy
+        content = None if refresh else self.resource_cache.get(resource_uri)
+        if content is not None:
+            self.resource_cache.move_to_end(resource_uri)
+        else:
+            # Fallback for URIs not listed by any server (e.g. papers://<topic>) - use the session owning the scheme
+            session = (
+                self.resource_sessions.get(resource_uri)
+                or self.uri_by_scheme.get(uri_scheme(resource_uri))
+            )
+                
+            if not session:
+                self.console.print(f"Resource '{resource_uri}' not found.")
+                return
             
-        if not session:
-            self.console.print(f"Resource '{resource_uri}' not found.")
-            return
-        
-        try:
-            result = await session.read_resource(uri=resource_uri)
-            if result and result.contents:
-                self.console.print(f"\nResource: {resource_uri}")
-                self.console.print("Content:")
-                self.console.print(result.contents[0].text)
-            else:
-                self.console.print("No content available.")
-        except Exception as e:
-            self.console.print(f"Error: {e}")
+            try:
+                result = await session.read_resource(uri=resource_uri)
+                if not (result and result.contents):
+                    self.console.print("No content available.")
+                    return
+                content = result.contents[0].text
+            except Exception as e:
+                self.console.print(f"Error: {e}")
+                return
+
+            self.resource_cache[resource_uri] = content
+            self.resource_cache.move_to_end(resource_uri)
+            if len(self.resource_cache) > RESOURCE_CACHE_SIZE:
+                # Evict the least recently used resource
+                self.resource_cache.popitem(last=False)
+
+        self.console.print(f"\nResource: {resource_uri}")
+        self.console.print("Content:")
+        self.console.print(content)
     
     async def list_prompts(self):
         """List all available prompts."""
@@ -181,7 +624,7 @@ class MCP_ChatBot:
     
     async def execute_prompt(self, prompt_name, args):
         """Execute a prompt with the given arguments."""
-        session = self.sessions.get(prompt_name)
+        session = self.prompt_sessions.get(prompt_name)
         if not session:
             self.console.print(f"Prompt '{prompt_name}' not found.")
             return
@@ -211,21 +654,27 @@ class MCP_ChatBot:
         self.console.print("Type your queries or 'quit' to exit.")
         
         while True:
+            # Read input on the event loop so session tasks keep running while we wait,
+            # and Ctrl-C can cancel the read (a thread blocked in input() can't be).
+            # Reader errors end the loop: retrying would just raise them again
+            self.console.print("\nQuery: ", end="")
+            try:
+                query = (await self.stdin_reader.readline()).strip()
+            except EOFError:
+                break
+            if not query:
+                continue
+
+            if query.lower() == 'quit':
+                break
+
             try:
-                query = input("\nQuery: ").strip()
-                if not query:
-                    continue
-        
-                if query.lower() == 'quit':
-                    break
-                
                 await self.process_query(query)
-                    
             except Exception as e:
                 self.console.print(f"\nError: {str(e)}")
     
     async def cleanup(self):
-        await self.exit_stack.aclose()
+        await asyncio.gather(*(server.close() for server in self.servers.values()))
 
 
 async def main():